@@ -4,31 +4,45 @@ import os
 import time
 from pathlib import Path
 import pandas as pd
-from dotenv import load_dotenv
 
 # Add parent directory to Python path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from core import automate, matching
+# Selenium/dotenv are imported lazily in the verification code: Streamlit re-executes
+# this module on every rerun and the Excel tab does not need them.
 from core.excel_processor import ExcelProcessor
-from core.lgestat import LGEstatAutomation, PersonData
 
-def process_excel_file(uploaded_file, output_dir=None):
-    """Process uploaded Excel file and return the processor instance."""
-    # Save uploaded file temporarily
-    temp_path = Path("temp_upload.xlsx")
-    with open(temp_path, "wb") as f:
-        f.write(uploaded_file.getvalue())
+VERIFY_WORKERS = 8  # parallel LGEstat browser sessions for the verification tab
+
+# Streamlit reruns the whole script on every interaction: cache the expensive steps
+@st.cache_data(show_spinner=False)
+def process_excel_upload(uploaded_file, output_dir=None) -> dict:
+    """Process an uploaded Excel file and return the run summary (cached on name + content)."""
+    # UploadedFile is already an in-memory file object: read it in place, no bytes copy
+    processor = ExcelProcessor(uploaded_file, output_dir=output_dir)
+    return processor.process()
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _read_cleaned_rows(path: str, mtime: float) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def load_cleaned_rows(cleaned_file: Path) -> pd.DataFrame:
+    """Read a cleaned_rows.csv (or its Parquet copy when present), cached on path + mtime."""
+    parquet_file = cleaned_file.with_suffix(".parquet")
+    if parquet_file.exists():
+        cleaned_file = parquet_file
+    # cache_resource skips cache_data's pickling round-trip; copy since callers modify the frame
+    return _read_cleaned_rows(str(cleaned_file), cleaned_file.stat().st_mtime).copy()
+
+@st.cache_resource(show_spinner=False)
+def _load_env() -> bool:
+    """Load .env once per process."""
+    from dotenv import load_dotenv
 
-    try:
-        # Process the file
-        processor = ExcelProcessor(temp_path, output_dir=output_dir)
-        summary = processor.process()
-        return processor, summary
-    finally:
-        # Clean up temp file
-        if temp_path.exists():
-            os.unlink(temp_path)
+    load_dotenv()
+    return True
 
 def prepare_verification_data(df: pd.DataFrame) -> pd.DataFrame:
     """Prepare DataFrame for group verification."""
@@ -59,7 +73,7 @@ def verify_groups_tab():
     st.header("2. Vérification des Groupes")
 
     # Load environment variables
-    load_dotenv()
+    _load_env()
     credentials = {
         "client_id": os.getenv("LGESTAT_CLIENT_ID"),
         "email": os.getenv("LGESTAT_EMAIL"),
@@ -70,6 +84,8 @@ def verify_groups_tab():
         st.error("Configuration LGEstat manquante. Vérifiez le fichier .env")
         return
 
+    from core.lgestat import LGEstatSession, PersonData, compare_groups, verify_concurrently
+
     # Data source selection
     data_source = st.radio(
         "Source des données",
@@ -81,20 +97,16 @@ def verify_groups_tab():
     verification_df = None
     if data_source == "Utiliser les données nettoyées":
         try:
-            # Look for most recent cleaned data
-            runs = sorted(Path(".").glob("run_*"))
+            # Look for most recent cleaned data (runs still being written have no cleaned_rows.csv yet)
+            runs = sorted(p for p in Path(".").glob("run_*") if (p / "cleaned_rows.csv").exists())
             if not runs:
                 st.warning("Aucune donnée nettoyée trouvée. Traitez d'abord un fichier Excel ou chargez un fichier directement.")
                 return
 
             latest_run = max(runs)
             cleaned_file = latest_run / "cleaned_rows.csv"
-            if cleaned_file.exists():
-                verification_df = pd.read_csv(cleaned_file)
-                st.success(f"Données chargées depuis: {cleaned_file}")
-            else:
-                st.warning("Fichier cleaned_rows.csv non trouvé dans le dernier traitement.")
-                return
+            verification_df = load_cleaned_rows(cleaned_file)
+            st.success(f"Données chargées depuis: {cleaned_file}")
         except Exception as e:
             st.error(f"Erreur lors du chargement des données nettoyées: {str(e)}")
             return
@@ -109,42 +121,13 @@ def verify_groups_tab():
         return
 
     try:
-        # Prepare verification data
-        if data_source == "Charger un nouveau fichier":
-            # Save and read uploaded file
-            temp_path = Path("temp_verify.xlsx")
-            with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getvalue())
-
-            # Read the file based on its type
-            if uploaded_file.name.endswith('.csv'):
-                verification_df = pd.read_csv(temp_path)
-            else:  # xlsx or numbers
-                verification_df = pd.read_excel(temp_path)
-
-        # Prepare data for verification
-        if verification_df is not None:
-            try:
-                verification_df = prepare_verification_data(verification_df)
-            except ValueError as ve:
-                st.error(f"Erreur dans le format des données: {str(ve)}")
-                return
-
-            # Show preview of data to verify
-            st.subheader("Aperçu des données à vérifier")
-            st.dataframe(verification_df.head())
-            temp_path = None
+        # Read the uploaded file in place (no temp file, no bytes copy)
         if data_source == "Charger un nouveau fichier":
-            # Handle uploaded file
-            temp_path = Path("temp_verify.xlsx")
-            with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getvalue())
-
-            # Read the file based on its type
+            uploaded_file.seek(0)
             if uploaded_file.name.endswith('.csv'):
-                verification_df = pd.read_csv(temp_path)
+                verification_df = pd.read_csv(uploaded_file)
             else:  # xlsx or numbers
-                verification_df = pd.read_excel(temp_path)
+                verification_df = pd.read_excel(uploaded_file)
 
         # Prepare and validate data
         if verification_df is not None:
@@ -160,82 +143,113 @@ def verify_groups_tab():
 
             # Initialize automation when ready
             if st.button("Lancer la vérification"):
-                lgestat = None
-                try:
-                    lgestat = LGEstatAutomation(
-                        client_id=credentials["client_id"],
-                        email=credentials["email"],
-                        password=credentials["password"],
-                        headless=False  # Temporarily set to False to see the browser
+                # Each numero is looked up once, even if the roster repeats it
+                unique_df = verification_df.drop_duplicates("numero_personne")
+                persons = [
+                    PersonData(
+                        numero=t.numero_personne,
+                        groupe_attendu=t.groupe_attendu,
+                        nom=getattr(t, "nom_prenom", "")
                     )
+                    for t in unique_df.itertuples(index=False)
+                ]
+                # Browsers shared by every user of the process (see LGEstatSession);
+                # headless by default so the workers don't open windows, LGESTAT_HEADLESS=0 to watch them
+                lock, lgestat = LGEstatSession.get(
+                    credentials["client_id"], credentials["email"], credentials["password"],
+                    headless=os.getenv("LGESTAT_HEADLESS", "1") != "0"
+                )
+                # One run at a time on the shared browsers (another user may be verifying)
+                if not lock.acquire(blocking=False):
+                    st.warning("Une vérification est déjà en cours, réessayez dans un instant.")
+                    return
 
+                try:
                     # Process verifications
                     with st.spinner("Vérification en cours..."):
-                        results = []
                         progress_bar = st.progress(0)
-                        total_rows = len(verification_df)
+                        total_rows = len(persons)
+
+                        # Always ask LGEstat for current memberships (a group may have been fixed since the last run)
+                        lgestat.clear_cache()
 
-                        # Login first
-                        if not lgestat.login():
+                        # Only as many browsers as there are persons; extra ones stay warm for later runs
+                        try:
+                            sessions = lgestat.open_sessions(min(VERIFY_WORKERS, total_rows))
+                            st.session_state["lgestat_connected"] = True
+                        except RuntimeError:
+                            lgestat.shutdown()  # don't keep half-dead browsers cached: next click starts fresh
                             st.error("Échec de connexion à LGEstat")
                             return
 
-                        # Process each person
-                        for idx, row in verification_df.iterrows():
-                            person = PersonData(
-                                numero=row["numero_personne"],
-                                groupe_attendu=row["groupe_attendu"],
-                                nom=row.get("nom_prenom", "")
-                            )
-                            result = lgestat.verify_person(person)
-                            results.append(result)
+                        # Verify persons concurrently
+                        groupe_trouve = [""] * total_rows
+                        details = [""] * total_rows
+                        for done, (i, result) in enumerate(verify_concurrently(persons, sessions), 1):
+                            groupe_trouve[i] = result["groupe_trouve"]
+                            details[i] = result["details"]
 
                             # Update progress
-                            progress = (idx + 1) / total_rows
-                            progress_bar.progress(progress)
-
-                        # Create results DataFrame
-                        results_df = pd.DataFrame(results)
-
-                        # Display results
-                        st.success("✅ Vérification terminée!")
-
-                        # Statistics
-                        total = len(results_df)
-                        verified = results_df["est_dans_groupe"].sum()
-                        failed = total - verified
-
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Total", total)
-                        with col2:
-                            st.metric("Vérifiés", int(verified))
-                        with col3:
-                            st.metric("Échoués", int(failed))
-
-                        # Detailed results
-                        st.subheader("Résultats détaillés")
-                        st.dataframe(results_df)
-
-                        # Export option
-                        if st.button("Exporter les résultats"):
-                            timestamp = time.strftime("%Y%m%d_%H%M%S")
-                            export_path = f"verification_resultats_{timestamp}.csv"
-                            results_df.to_csv(export_path, index=False)
-                            st.success(f"Résultats exportés: {export_path}")
-
+                            progress_bar.progress(done / total_rows)
                 finally:
-                    if lgestat:
-                        lgestat.close()
+                    lock.release()
+
+                # Map the lookups back onto every input row and compare groups, in input order
+                results_df = compare_groups(
+                    verification_df[["numero_personne", "groupe_attendu"]].assign(
+                        nom=verification_df.get("nom_prenom", "")
+                    ),
+                    unique_df["numero_personne"], groupe_trouve, details
+                )
+
+                # Display results
+                st.success("✅ Vérification terminée!")
+
+                # Statistics
+                total = len(results_df)
+                verified = results_df["est_dans_groupe"].sum()
+                failed = total - verified
+
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total", total)
+                with col2:
+                    st.metric("Vérifiés", int(verified))
+                with col3:
+                    st.metric("Échoués", int(failed))
+
+                # Detailed results
+                st.subheader("Résultats détaillés")
+                st.dataframe(results_df)
+
+                # Export option
+                if st.button("Exporter les résultats"):
+                    timestamp = time.strftime("%Y%m%d_%H%M%S")
+                    export_path = f"verification_resultats_{timestamp}.csv"
+                    results_df.to_csv(export_path, index=False)
+                    st.success(f"Résultats exportés: {export_path}")
+
+            # Browsers stay open between runs; close them explicitly
+            if st.session_state.get("lgestat_connected") and st.button("Déconnexion LGEstat"):
+                lock, lgestat = LGEstatSession.get(
+                    credentials["client_id"], credentials["email"], credentials["password"],
+                    headless=os.getenv("LGESTAT_HEADLESS", "1") != "0"
+                )
+                # Never quit browsers under another user's run
+                if not lock.acquire(blocking=False):
+                    st.warning("Une vérification est en cours, déconnexion impossible pour le moment.")
+                else:
+                    try:
+                        lgestat.shutdown()
+                        lgestat.clear_cache()
+                    finally:
+                        lock.release()
+                    st.session_state["lgestat_connected"] = False
+                    st.success("Sessions LGEstat fermées")
 
     except Exception as e:
         st.error(f"Erreur lors de la vérification: {str(e)}")
 
-    finally:
-        # Cleanup temporary file
-        if temp_path and temp_path.exists():
-            os.unlink(temp_path)
-
 def main():
     st.title("FIA Automation Tools")
 
@@ -249,7 +263,7 @@ def main():
 
         if uploaded_file:
             try:
-                processor, summary = process_excel_file(uploaded_file)
+                summary = process_excel_upload(uploaded_file)
 
                 # Display summary
                 st.success("✅ Fichier traité avec succès!")
@@ -264,8 +278,9 @@ def main():
                 st.json(summary)
 
                 # Show preview of cleaned data
-                if Path(summary["outdir"]).joinpath("cleaned_rows.csv").exists():
-                    cleaned_data = processor.get_processed_data()
+                cleaned_file = Path(summary["outdir"]) / "cleaned_rows.csv"
+                if cleaned_file.exists():
+                    cleaned_data = load_cleaned_rows(cleaned_file)
                     st.subheader("Aperçu des données nettoyées")
                     st.dataframe(cleaned_data.head())
 
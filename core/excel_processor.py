@@ -6,13 +6,20 @@ Processes Excel files with participant data for FIA automation.
 """
 
 import json
-from datetime import datetime
+import os
+from datetime import date, datetime
+from itertools import chain, islice
 from pathlib import Path
 import re
-from typing import Dict, List
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from loguru import logger
+from python_calamine import load_workbook
 from unidecode import unidecode
 
 # Phone cleanup with optional E.164 using phonenumbers (if available)
@@ -27,6 +34,11 @@ HEADER_SEARCH_ROWS = 60       # scan top rows to find header line
 HEADER_SEARCH_COLS = 40       # scan left-most cols to speed up
 TOP_SCAN_ROWS = 12            # rows to scan for "Numero du Groupe" in the top block
 TOP_SCAN_COLS = 8
+SNAPSHOT_ROWS = 80            # top-left block saved to input_snapshot.csv
+SNAPSHOT_COLS = 20
+SCAN_READ_ROWS = max(HEADER_SEARCH_ROWS, SNAPSHOT_ROWS)   # first read only parses this block
+SCAN_READ_COLS = max(HEADER_SEARCH_COLS, SNAPSHOT_COLS)
+CHUNK_ROWS = 50_000           # data rows cleaned/written per chunk
 
 WANTED_LABELS = {
     "code_perso": [
@@ -42,37 +54,108 @@ WANTED_LABELS = {
     "telephone": ["téléphone", "telephone", "tel", "no de téléphone", "no de telephone", "numero de telephone"],
 }
 
+# Output files: every column is written as text
+CLEANED_SCHEMA = pa.schema([(c, pa.string()) for c in ("code_perso", "nom_prenom", "courriel", "telephone", "numero_groupe")])
+ERRORS_SCHEMA = CLEANED_SCHEMA.append(pa.field("raison", pa.string()))
+
+# One alternation per label family: a single .search() tells whether a row/cell hits the family
+FAMILY_RES = {
+    canonical: re.compile("|".join(re.escape(lbl) for lbl in family))
+    for canonical, family in WANTED_LABELS.items()
+}
+# All families in one pattern with a named group per canonical key: m.lastgroup is the key
+LABEL_RE = re.compile("|".join(
+    f"(?P<{canonical}>{family_re.pattern})" for canonical, family_re in FAMILY_RES.items()
+))
+CELL_SEP = "\x1f"  # joins a row's cells; never part of a label, so matches cannot span cells
+
+def _convert_cell(value):
+    """Convert a calamine cell the way pandas does (empty -> NaN, integral float -> int)."""
+    if isinstance(value, str):
+        return value if value != "" else np.nan
+    if isinstance(value, float):
+        i = int(value)
+        return i if i == value else value
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
 class ExcelProcessor:
-    def __init__(self, input_path: str, sheet_name=0, output_dir: str = ""):
-        """Initialize Excel processor with input file path and optional output directory."""
-        self.input_path = Path(input_path)
+    # Precompiled patterns (used per cell during the header scan and per phone value)
+    _WS_RE = re.compile(r"\s+")
+    _PHONE_RE = re.compile(r"[^\d+]")
+    _GROUP_RE = re.compile(r"(numero|numero du|no du)\s+groupe[: ]*")
+
+    def __init__(self, input_path: Union[str, Path, BinaryIO], sheet_name=0, output_dir: str = "", debug: bool = False):
+        """Initialize Excel processor with input file path (or binary buffer) and optional output directory.
+
+        debug=True also writes input_snapshot.csv (top-left block of the raw sheet).
+        """
+        if hasattr(input_path, "read"):
+            # In-memory upload: keep a display name, read from the buffer
+            self.source = input_path
+            self.input_path = Path(getattr(input_path, "name", "") or "upload.xlsx")
+        else:
+            self.input_path = Path(input_path)
+            self.source = self.input_path
         self.sheet_name = sheet_name
+        self.debug = debug
         self.ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.outdir = Path(output_dir) if output_dir else Path(f"run_{self.ts}")
+        self._own_outdir = not output_dir  # default run dir: must not be shared with another run
+
+    def make_outdir(self) -> None:
+        """Create the output directory; default run dirs get a numeric suffix instead of being reused."""
+        if not self._own_outdir:
+            self.outdir.mkdir(parents=True, exist_ok=True)
+            return
+        base, n = self.outdir, 1
+        while True:
+            try:
+                self.outdir.mkdir(parents=True)
+                return
+            except FileExistsError:
+                # Another run started in the same second
+                n += 1
+                self.outdir = Path(f"{base}_{n}")
 
     def norm_text(self, x: str) -> str:
         """Lowercase, strip, unaccent, collapse spaces."""
         if x is None:
             return ""
         s = unidecode(str(x)).lower().strip()
-        s = re.sub(r"\\s+", " ", s)
+        s = self._WS_RE.sub(" ", s)
         return s
 
-    def find_header_row(self, df: pd.DataFrame) -> int:
+    def normalize_block(self, df_raw: pd.DataFrame) -> np.ndarray:
+        """Return norm_text applied once to every cell of the header search block."""
+        block = df_raw.iloc[:HEADER_SEARCH_ROWS, :HEADER_SEARCH_COLS].to_numpy()
+        return np.vectorize(self.norm_text, otypes=[object])(block)
+
+    def find_header_row(self, norm_scan: np.ndarray) -> int:
         """Return the row index of the header that contains at least two wanted labels."""
-        n_rows = min(HEADER_SEARCH_ROWS, len(df))
-        n_cols = min(HEADER_SEARCH_COLS, df.shape[1])
-        for r in range(n_rows):
-            row = [self.norm_text(v) for v in df.iloc[r, :n_cols].tolist()]
+        for r, row in enumerate(norm_scan):
+            line = CELL_SEP.join(row)
             # test presence of at least two of our desired label families
-            hits = 0
-            for family in WANTED_LABELS.values():
-                if any(any(lbl in cell for lbl in family) for cell in row):
-                    hits += 1
+            hits = sum(1 for family_re in FAMILY_RES.values() if family_re.search(line))
             if hits >= 2:
                 return r
         raise RuntimeError("Impossible de localiser la ligne d'en-tête (labels non trouvés dans les premières lignes).")
 
+    def header_names(self, values: List) -> List[str]:
+        """Normalize header cells into unique column names ("x", "x.1", ... like pandas)."""
+        names = []
+        seen: Dict[str, int] = {}
+        for v in values:
+            n = self.norm_text(v)
+            if n in seen:
+                seen[n] += 1
+                n = f"{n}.{seen[n]}"
+            else:
+                seen[n] = 0
+            names.append(n)
+        return names
+
     def map_columns(self, header_row: pd.Series) -> dict:
         """Map raw header names to canonical keys."""
         mapping = {}
@@ -80,20 +163,20 @@ class ExcelProcessor:
             n = self.norm_text(name)
             if not n:
                 continue
-            for canonical, family in WANTED_LABELS.items():
-                if any(lbl == n or lbl in n for lbl in family):
-                    # Keep first match only
-                    mapping.setdefault(canonical, col_idx)
+            m = LABEL_RE.search(n)
+            if m:
+                # Keep first match only
+                mapping.setdefault(m.lastgroup, col_idx)
         return mapping
 
-    def scan_top_for_group(self, df_raw: pd.DataFrame) -> str:
+    def scan_top_for_group(self, df_raw: pd.DataFrame, norm_scan: np.ndarray) -> str:
         """Scan the top-left block to find 'Numero du Groupe' and return the adjacent value."""
-        n_rows = min(TOP_SCAN_ROWS, len(df_raw))
-        n_cols = min(TOP_SCAN_COLS, df_raw.shape[1])
+        n_rows = min(TOP_SCAN_ROWS, norm_scan.shape[0])
+        n_cols = min(TOP_SCAN_COLS, norm_scan.shape[1])
         for r in range(n_rows):
             for c in range(n_cols):
-                v = self.norm_text(df_raw.iloc[r, c])
-                if re.fullmatch(r"(numero|numero du|no du)\\s+groupe[: ]*", v):
+                v = norm_scan[r, c]
+                if self._GROUP_RE.fullmatch(v):
                     if c + 1 < n_cols:
                         val = str(df_raw.iloc[r, c + 1]).strip()
                         if val and val.lower() != "nan":
@@ -101,7 +184,7 @@ class ExcelProcessor:
         # Fallback: fuzzy search
         for r in range(n_rows):
             for c in range(n_cols):
-                v = self.norm_text(df_raw.iloc[r, c])
+                v = norm_scan[r, c]
                 if "numero du groupe" in v or "no du groupe" in v or "numero groupe" in v:
                     if c + 1 < n_cols:
                         val = str(df_raw.iloc[r, c + 1]).strip()
@@ -114,9 +197,13 @@ class ExcelProcessor:
         if value is None:
             return ""
         s = str(value).strip()
-        s = re.sub(r"[^\\d+]", "", s)  # keep digits and plus
+        s = self._PHONE_RE.sub("", s)  # keep digits and plus
         if not s:
             return ""
+        return self._format_one(s, region)
+
+    def _format_one(self, s: str, region="CA") -> str:
+        """Format an already cleaned digit string as E.164 when phonenumbers accepts it."""
         if PHONENUMBERS_AVAILABLE:
             try:
                 p = phonenumbers.parse(s, region)
@@ -126,97 +213,170 @@ class ExcelProcessor:
                 pass
         return s
 
-    def process(self) -> Dict:
-        """Process the Excel file and return summary of results."""
-        if not self.input_path.exists():
-            raise FileNotFoundError(f"File not found: {self.input_path}")
+    def clean_phones(self, values: pd.Series, region="CA", cache: Optional[Dict[str, str]] = None) -> pd.Series:
+        """Vectorized clean_phone: one regex pass over the column, phonenumbers once per distinct value."""
+        # cache (digits -> formatted) is filled in place so it can be shared across chunks
+        if cache is None:
+            cache = {}
+        digits = values.astype(str).str.replace(self._PHONE_RE, "", regex=True)
+        for s in pd.unique(digits):
+            if s not in cache:
+                cache[s] = self._format_one(s, region) if s else ""
+        return digits.map(cache)
 
-        # Create output directory
-        self.outdir.mkdir(parents=True, exist_ok=True)
+    def iter_rows(self) -> Iterator[List]:
+        """Yield the raw sheet rows one by one, with cells converted like pandas' calamine reader."""
+        if not isinstance(self.source, Path):
+            self.source.seek(0)
+        wb = load_workbook(self.source)
+        if isinstance(self.sheet_name, int):
+            sheet = wb.get_sheet_by_index(self.sheet_name)
+        else:
+            sheet = wb.get_sheet_by_name(self.sheet_name)
+        if sheet.start is None:  # empty sheet
+            return
+        # iter_rows() pads the leading empty rows but not the leading empty columns
+        pad = [np.nan] * sheet.start[1]
+        for row in sheet.iter_rows():
+            yield pad + [_convert_cell(v) for v in row]
 
-        # Read raw file without headers
-        df_raw = pd.read_excel(self.input_path, header=None, sheet_name=self.sheet_name, engine="openpyxl")
-        df_raw.iloc[:80, :20].to_csv(self.outdir / "input_snapshot.csv", index=False)
+    def clean_chunk(self, df: pd.DataFrame, mapping: dict, numero_groupe: str,
+                    phone_cache: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Clean one chunk of data rows and split it into (cleaned, errors)."""
+        # Map columns (positions -> names; header names are unique, see header_names)
+        cols = df.columns
 
-        # Extract group number and process headers
-        numero_groupe = self.scan_top_for_group(df_raw)
-        header_row_index = self.find_header_row(df_raw)
-        header_series = df_raw.iloc[header_row_index]
-        mapping = self.map_columns(header_series)
-
-        # Read with proper headers
-        df = pd.read_excel(self.input_path, header=header_row_index, sheet_name=self.sheet_name, engine="openpyxl")
-        df.columns = [self.norm_text(c) for c in df.columns]
-
-        # Map columns
-        def get_col_idx_or_name(canon_key):
-            if canon_key not in mapping:
-                return None
-            target_idx = mapping[canon_key]
-            try:
-                return df.columns[target_idx]
-            except Exception:
-                return None
+        def get_col(canon_key):
+            i = mapping.get(canon_key)
+            return cols[i] if i is not None and i < len(cols) else None
+
+        def as_text(col):
+            s = df[col]
+            return s if pd.api.types.is_string_dtype(s) else s.astype(str)
 
         # Extract columns
-        col_code = get_col_idx_or_name("code_perso")
-        col_nom = get_col_idx_or_name("nom_prenom")
-        col_mail = get_col_idx_or_name("courriel")
-        col_tel = get_col_idx_or_name("telephone")
+        col_code = get_col("code_perso")
+        col_nom = get_col("nom_prenom")
+        col_mail = get_col("courriel")
+        col_tel = get_col("telephone")
 
         # Build working dataframe
-        work = pd.DataFrame()
-        work["code_perso"] = df[col_code] if col_code and col_code in df.columns else ""
-        work["nom_prenom"] = df[col_nom].astype(str).str.strip() if col_nom and col_nom in df.columns else ""
-        work["courriel"] = df[col_mail].astype(str).str.strip().str.lower() if col_mail and col_mail in df.columns else ""
-        work["telephone_raw"] = df[col_tel] if col_tel and col_tel in df.columns else ""
+        work = pd.DataFrame(index=df.index)
+        work["code_perso"] = df[col_code].astype("string") if col_code else ""
+        work["nom_prenom"] = as_text(col_nom).str.strip() if col_nom else ""
+        work["courriel"] = as_text(col_mail).str.strip().str.lower() if col_mail else ""
+        work["telephone_raw"] = df[col_tel] if col_tel else ""
 
         # Clean data
-        work["telephone"] = work["telephone_raw"].apply(lambda v: self.clean_phone(v, region="CA"))
+        work["telephone"] = self.clean_phones(work["telephone_raw"], region="CA", cache=phone_cache)
         work.drop(columns=["telephone_raw"], inplace=True)
         work["numero_groupe"] = numero_groupe
 
-        # Filter rows
-        is_all_empty = (work[["code_perso","nom_prenom","courriel","telephone"]]
-                       .astype(str).apply(lambda s: s.str.strip())
-                       .replace({"": None}).isna().all(axis=1))
+        # Filter rows (one strip per column, then a single NumPy comparison)
+        stripped = np.stack(
+            [work[c].astype(str).str.strip().fillna("").to_numpy(dtype=object)
+             for c in ("code_perso", "nom_prenom", "courriel", "telephone")],
+            axis=1,
+        )
+        is_all_empty = (stripped == "").all(axis=1)
         work = work.loc[~is_all_empty].reset_index(drop=True)
 
         # Validate rows
-        ok_mask = (work["telephone"].astype(str).str.len() > 0) | (work["nom_prenom"].astype(str).str.len() > 0)
+        ok_mask = ((work["telephone"].astype(str).str.len().to_numpy() > 0)
+                   | (work["nom_prenom"].astype(str).str.len().to_numpy() > 0))
         cleaned = work.loc[ok_mask].copy()
         errors = work.loc[~ok_mask].copy()
-        if not errors.empty:
-            errors["raison"] = "Manque phone ET nom_prenom"
+        errors["raison"] = "Manque phone ET nom_prenom"
+        return cleaned, errors
+
+    def process(self) -> Dict:
+        """Process the Excel file and return summary of results."""
+        if isinstance(self.source, Path) and not self.source.exists():
+            raise FileNotFoundError(f"File not found: {self.input_path}")
+
+        # Create output directory
+        self.make_outdir()
+
+        # Only the top-left block is materialized for the header scan + snapshot
+        rows = self.iter_rows()
+        head = list(islice(rows, SCAN_READ_ROWS))
+        df_raw = pd.DataFrame(head, dtype=object).iloc[:, :SCAN_READ_COLS]
+        if self.debug:
+            df_raw.iloc[:SNAPSHOT_ROWS, :SNAPSHOT_COLS].to_csv(self.outdir / "input_snapshot.csv", index=False)
+
+        # Extract group number and process headers
+        norm_scan = self.normalize_block(df_raw)
+        numero_groupe = self.scan_top_for_group(df_raw, norm_scan)
+        header_row_index = self.find_header_row(norm_scan)
+        header_values = head[header_row_index]
+        mapping = self.map_columns(pd.Series(header_values, dtype=object))
+        columns = self.header_names(header_values)
+
+        # Stream the data rows chunk by chunk: peak memory is O(CHUNK_ROWS), not O(sheet)
+        data_rows = chain(head[header_row_index + 1:], rows)
+        # Outputs are written under a ".part" name and renamed when complete, so a reader
+        # (e.g. the verification tab picking the latest run) never sees a half-written file
+        cleaned_path = self.outdir / "cleaned_rows.csv.part"
+        parquet_path = self.outdir / "cleaned_rows.parquet.part"
+        errors_path = self.outdir / "errors.csv.part"
+        n_total = n_cleaned = n_errors = 0
+        phone_cache: Dict[str, str] = {}  # each distinct number goes through phonenumbers once per run
+        # Arrow's CSV writer encodes in C; the header is written once when the file is opened.
+        # The Parquet copy of the cleaned rows is what get_processed_data reads back (no text parsing).
+        with pacsv.CSVWriter(str(cleaned_path), CLEANED_SCHEMA) as cleaned_writer, \
+                pq.ParquetWriter(str(parquet_path), CLEANED_SCHEMA, compression="zstd") as parquet_writer, \
+                pacsv.CSVWriter(str(errors_path), ERRORS_SCHEMA) as errors_writer:
+            while True:
+                chunk = list(islice(data_rows, CHUNK_ROWS))
+                if not chunk:
+                    break
+                df = pd.DataFrame(chunk, columns=columns, dtype=object)
+                df.dropna(how="all", inplace=True)
+                cleaned, errors = self.clean_chunk(df, mapping, numero_groupe, phone_cache)
+
+                # Save outputs
+                cleaned_table = pa.Table.from_pandas(cleaned, schema=CLEANED_SCHEMA, preserve_index=False)
+                cleaned_writer.write_table(cleaned_table)
+                parquet_writer.write_table(cleaned_table)
+                errors_writer.write_table(pa.Table.from_pandas(errors, schema=ERRORS_SCHEMA, preserve_index=False))
+
+                n_total += len(cleaned) + len(errors)
+                n_cleaned += len(cleaned)
+                n_errors += len(errors)
 
-        # Save outputs
-        cleaned.to_csv(self.outdir / "cleaned_rows.csv", index=False)
-        errors.to_csv(self.outdir / "errors.csv", index=False)
+        # Publish (cleaned_rows.csv last: its presence marks a complete run)
+        for part in (errors_path, parquet_path, cleaned_path):
+            os.replace(part, part.with_suffix(""))
 
         # Create summary
         summary = {
             "input": str(self.input_path),
             "outdir": str(self.outdir),
             "numero_groupe_detecte": numero_groupe,
-            "rows_total": int(len(work)),
-            "rows_cleaned": int(len(cleaned)),
-            "rows_errors": int(len(errors)),
+            "rows_total": int(n_total),
+            "rows_cleaned": int(n_cleaned),
+            "rows_errors": int(n_errors),
             "columns_mapping": mapping,
             "header_row_index": int(header_row_index),
             "phonenumbers_available": PHONENUMBERS_AVAILABLE,
             "timestamp": self.ts,
         }
 
-        with open(self.outdir / "run_summary.json", "w", encoding="utf-8") as f:
+        summary_part = self.outdir / "run_summary.json.part"
+        with open(summary_part, "w", encoding="utf-8") as f:
             json.dump(summary, f, ensure_ascii=False, indent=2)
+        os.replace(summary_part, self.outdir / "run_summary.json")
 
-        logger.success(f"OK: cleaned_rows.csv ({len(cleaned)}), errors.csv ({len(errors)}), numero_groupe='{numero_groupe}'")
+        logger.success(f"OK: cleaned_rows.csv ({n_cleaned}), errors.csv ({n_errors}), numero_groupe='{numero_groupe}'")
         logger.info(f"Résumé -> {self.outdir/'run_summary.json'}")
 
         return summary
 
     def get_processed_data(self) -> pd.DataFrame:
         """Return the cleaned data as a DataFrame for further processing."""
+        parquet_file = self.outdir / "cleaned_rows.parquet"
+        if parquet_file.exists():
+            return pd.read_parquet(parquet_file)
         cleaned_file = self.outdir / "cleaned_rows.csv"
         if cleaned_file.exists():
             return pd.read_csv(cleaned_file)
@@ -3,25 +3,100 @@ LGEstat automation module
 ------------------------
 Handles interaction with LGEstat web interface for automated group verification
 and other automation tasks.
+
+Element lookups use explicit waits (WebDriverWait) only: the implicit wait is kept
+at 0, mixing both makes wait times unpredictable.
+
+Selenium, webdriver-manager, pandas and httpx are imported where they are used so that
+importing this module (e.g. `verify_groups.py --help`) stays fast.
 """
 
+from __future__ import annotations
+
+import csv
+import hashlib
+import importlib.util
 import os
-import time
-from typing import Optional, Dict, List
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Iterator, List, Tuple
 from dataclasses import dataclass
+from datetime import date
 from pathlib import Path
 
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from loguru import logger
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Optional HTTP fast path for person lookups (if available; imported on first use)
+HTTPX_AVAILABLE = importlib.util.find_spec("httpx") is not None
+
+# Columns of the verification report (compare_groups output)
+RESULT_COLUMNS = ["numero_personne", "groupe_attendu", "nom", "prenom", "est_dans_groupe", "groupe_trouve", "details"]
+
+# Explicit waits re-check every 50 ms instead of Selenium's default 500 ms
+POLL_FREQUENCY = 0.05
+
+# Persistent Chrome profiles (<account>/worker-<n>) so later runs start logged in
+CHROME_PROFILE_DIR = Path.home() / ".cache" / "fia-automation" / "chrome-profile"
+
+# On-disk numero -> groupe cache, only reused on the day it was written
+GROUP_CACHE_PATH = Path.home() / ".cache" / "fia-automation" / "lgestat_groups.json"
+
+_DRIVER_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _install_driver() -> str:
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    return ChromeDriverManager().install()
+
+
+def chrome_driver_path() -> str:
+    """Resolve the ChromeDriver binary once per process (shared by every session)."""
+    with _DRIVER_LOCK:  # parallel logins must not each run the install
+        return _install_driver()
+
+
+def _lock_profile(profile: Path):
+    """
+    Take an exclusive lock on a Chrome profile directory, held until the returned file is closed
+    (the OS releases it if the process dies). Returns None if another browser already uses it.
+    """
+    profile.mkdir(parents=True, exist_ok=True)
+    lock_file = open(profile.parent / f"{profile.name}.lock", "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+class _GroupCache(dict):
+    """numero -> groupe trouvé, only valid on the day it was filled (shared by a session and its clones)."""
+
+    def __init__(self):
+        super().__init__()
+        self.day = date.today().isoformat()
+
+    def fresh(self) -> "_GroupCache":
+        """Drop every entry once the day has changed (memberships may have moved), then return self."""
+        today = date.today().isoformat()
+        if self.day != today:
+            self.clear()
+            self.day = today
+        return self
+
 @dataclass
 class PersonData:
     """Structure to hold person information."""
@@ -37,16 +112,38 @@ class LGEstatAutomation:
     LOGIN_URL = f"{BASE_URL}/fr/auth/login"
     SEARCH_URL = f"{BASE_URL}/fr/search"  # Add the actual search URL
 
-    def __init__(self, client_id: str, email: str, password: str, headless: bool = True):
-        """Initialize LGEstat automation with credentials."""
+    # Locators built once; raw By values ("name", "css selector", ...) since selenium is imported lazily
+    _SEL_ID = ("name", "id")
+    _SEL_EMAIL = ("name", "email")
+    _SEL_PASSWORD = ("name", "password")
+    _SEL_SUBMIT = ("css selector", "input[type='submit'][value='Connexion']")
+    _SEL_DASHBOARD = ("class name", "dashboard")
+    _SEL_SEARCH = ("name", "search")
+    _SEL_GROUP = ("css selector", "span[data-field='groupe']")
+    _SEL_NO_RESULTS = ("css selector", ".no-results")
+
+    def __init__(self, client_id: str, email: str, password: str, headless: bool = True,
+                 profile_dir: Optional[Path] = CHROME_PROFILE_DIR, worker: int = 0):
+        """Initialize LGEstat automation with credentials (profile_dir=None for a throwaway profile)."""
         self.client_id = client_id
         self.email = email
         self.password = password
         self.headless = headless
+        self.profile_dir = profile_dir
+        self.worker = worker  # profile sub-directory: Chrome locks a profile to one browser
         self.driver = None
+        self._profile_lock = None
+        self._workers: List["LGEstatAutomation"] = []  # extra browsers kept warm for verify_dataframe
+        self._group_cache = _GroupCache()  # numero -> groupe trouvé, shared with clones
+        self._http_session = None  # httpx client carrying the browser's session cookies
+        self._person_api_url = ""
 
     def start_driver(self) -> None:
         """Initialize and configure Chrome WebDriver."""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+
         options = Options()
         # Add standard options for stability
         options.add_argument("--no-sandbox")
@@ -57,18 +154,59 @@ class LGEstatAutomation:
         options.add_argument("--disable-gpu")
         options.add_argument("--no-sandbox")
         options.add_argument("--window-size=1280,1024")
-
-        # Use ChromeDriverManager to get the correct driver version
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
+        # driver.get() returns at DOMContentLoaded; the lookups wait for their own elements
+        options.page_load_strategy = "eager"
+        # Images are never needed to read the group field
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        profile = self._claim_profile()
+        if profile is not None:
+            options.add_argument(f"--user-data-dir={profile}")
+
+        # ChromeDriverManager is only queried once, then the path is reused
+        service = Service(chrome_driver_path())
+        try:
+            self.driver = webdriver.Chrome(service=service, options=options)
+        except Exception:
+            self._release_profile()
+            raise
         self.driver.set_page_load_timeout(60)
-        self.driver.implicitly_wait(10)
+        self.driver.implicitly_wait(0)  # explicit waits only (see module docstring)
+
+    def _wait(self, timeout: float):
+        """WebDriverWait on this driver at POLL_FREQUENCY."""
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        return WebDriverWait(self.driver, timeout, poll_frequency=POLL_FREQUENCY)
+
+    def _claim_profile(self) -> Optional[Path]:
+        """
+        Lock and return this session's persistent profile, or None for a throwaway one.
+        Profiles are per account (so saved cookies always belong to these credentials) and per
+        worker; a profile already used by another browser (e.g. the app while the CLI runs) is skipped.
+        """
+        if self.profile_dir is None:
+            return None
+        account = hashlib.sha1(f"{self.client_id}\0{self.email}".encode("utf-8")).hexdigest()[:12]
+        profile = Path(self.profile_dir) / account / f"worker-{self.worker}"
+        self._profile_lock = _lock_profile(profile)
+        if self._profile_lock is None:
+            logger.warning(f"Profil Chrome déjà utilisé ({profile}), profil temporaire utilisé")
+            return None
+        return profile
+
+    def _release_profile(self) -> None:
+        if self._profile_lock is not None:
+            self._profile_lock.close()
+            self._profile_lock = None
 
     def login(self) -> bool:
         """
         Log into LGEstat using provided credentials.
         Returns True if login successful, False otherwise.
         """
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support import expected_conditions as EC
+
         if not self.driver:
             self.start_driver()
 
@@ -76,28 +214,39 @@ class LGEstatAutomation:
             logger.info("Accessing LGEstat login page...")
             self.driver.get(self.LOGIN_URL)
 
+            # The persistent profile may still hold a valid session: LGEstat redirects away from login
+            if "/auth/login" not in self.driver.current_url:
+                logger.success("✅ Session LGEstat déjà active")
+                self._start_http_session()
+                return True
+
             # Fill in login form
-            self.driver.find_element(By.NAME, "id").send_keys(self.client_id)
-            self.driver.find_element(By.NAME, "email").send_keys(self.email)
-            self.driver.find_element(By.NAME, "password").send_keys(self.password)
+            wait = self._wait(10)
+            wait.until(EC.presence_of_element_located(self._SEL_ID)).send_keys(self.client_id)
+            wait.until(EC.presence_of_element_located(self._SEL_EMAIL)).send_keys(self.email)
+            wait.until(EC.presence_of_element_located(self._SEL_PASSWORD)).send_keys(self.password)
 
             # Click login button
-            submit_button = self.driver.find_element(By.CSS_SELECTOR, "input[type='submit'][value='Connexion']")
+            submit_button = wait.until(EC.element_to_be_clickable(self._SEL_SUBMIT))
             submit_button.click()
 
-            # Wait for redirect/login completion
-            time.sleep(2)
+            # Wait for redirect/login completion (explicit wait: returns as soon as we leave the login page)
+            try:
+                self._wait(10).until(lambda d: "/auth/login" not in d.current_url)
+            except TimeoutException:
+                pass  # still on the login page: reported below
 
             # Check if login was successful
             is_logged_in = "/auth/login" not in self.driver.current_url
 
             if is_logged_in:
                 logger.success("✅ Connexion réussie à LGEstat!")
+                self._start_http_session()
                 # Try to get and log the user name or any welcome message if available
                 try:
                     # Wait for the dashboard to load
-                    WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "dashboard"))
+                    self._wait(5).until(
+                        EC.presence_of_element_located(self._SEL_DASHBOARD)
                     )
                     logger.info("📊 Dashboard chargé avec succès")
                 except Exception:
@@ -111,33 +260,82 @@ class LGEstatAutomation:
             logger.error(f"❌ Échec de la connexion: {str(e)}")
             return False
 
+    def _start_http_session(self) -> None:
+        """Open an httpx client authenticated with the browser's cookies (if the JSON endpoint is configured)."""
+        # JSON lookup endpoint, e.g. "https://app.lgestat.com/api/person/{numero}"; unset = Selenium only
+        self._person_api_url = os.getenv("LGESTAT_PERSON_API_URL", "")
+        if not (HTTPX_AVAILABLE and self._person_api_url):
+            return
+        import httpx
+
+        if self._http_session is not None:
+            self._http_session.close()
+        try:
+            client = httpx.Client(http2=True, timeout=10)
+        except ImportError:  # http2 needs the h2 package
+            client = httpx.Client(timeout=10)
+        for cookie in self.driver.get_cookies():
+            client.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""))
+        self._http_session = client
+
+    def fetch_group_http(self, numero: str) -> Optional[str]:
+        """
+        Look up a person's group through the JSON endpoint.
+        Returns None when unavailable or on any failure, so the caller falls back to Selenium.
+        """
+        if self._http_session is None:
+            return None
+        try:
+            response = self._http_session.get(self._person_api_url.format(numero=numero))
+            if response.status_code != 200:
+                logger.debug(f"API {response.status_code} pour {numero}, repli sur le navigateur")
+                return None
+            groupe = str(response.json().get("groupe") or "").strip().upper()
+            return groupe or None
+        except Exception as e:
+            logger.debug(f"API indisponible pour {numero} ({e}), repli sur le navigateur")
+            return None
+
     def search_person(self, numero: str) -> bool:
         """
         Navigate to search page and look for a person by their number.
         Returns True if person is found.
         """
-        try:
-            logger.info(f"🔍 Recherche de la personne {numero}...")
+        from selenium.webdriver.common.keys import Keys
+        from selenium.webdriver.support import expected_conditions as EC
 
-            # Navigate to search page
+        logger.info(f"🔍 Recherche de la personne {numero}...")
+
+        # Navigate to search page; a session expired mid-run redirects to the login page.
+        # Outside the try: a failed re-login is an error, not "person not found".
+        self.driver.get(self.SEARCH_URL)
+        if "/auth/login" in self.driver.current_url:
+            logger.warning("Session LGEstat expirée, reconnexion...")
+            if not self.login():
+                raise RuntimeError("Failed to login to LGEstat")
             self.driver.get(self.SEARCH_URL)
-            logger.debug("Page de recherche chargée")
+        logger.debug("Page de recherche chargée")
 
+        try:
             # Wait for search input and enter person number
-            search_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.NAME, "search"))
+            search_input = self._wait(10).until(
+                EC.presence_of_element_located(self._SEL_SEARCH)
             )
             search_input.clear()
             search_input.send_keys(numero)
             search_input.send_keys(Keys.RETURN)
             logger.debug(f"Numéro {numero} saisi et recherche lancée")
 
-            # Wait for results and verify
-            time.sleep(2)  # Allow time for results to load
+            # Wait for results: either the group field or the "no results" message
+            self._wait(10).until(EC.any_of(
+                EC.presence_of_element_located(self._SEL_GROUP),
+                EC.presence_of_element_located(self._SEL_NO_RESULTS),
+            ))
 
-            # Add visual confirmation
-            if not self.headless:
-                time.sleep(1)  # Additional pause to see results in non-headless mode
+            # The "no results" message matched: don't let get_person_group wait for a field that won't come
+            if self.driver.find_elements(*self._SEL_NO_RESULTS) and not self.driver.find_elements(*self._SEL_GROUP):
+                logger.warning(f"Aucun résultat pour {numero}")
+                return False
 
             logger.success(f"✅ Recherche effectuée pour {numero}")
             return True
@@ -148,10 +346,12 @@ class LGEstatAutomation:
 
     def get_person_group(self) -> str:
         """Extract group information from person details page."""
+        from selenium.webdriver.support import expected_conditions as EC
+
         try:
             # Wait for and find the group element (adjust selector based on actual page)
-            group_element = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "span[data-field='groupe']"))
+            group_element = self._wait(10).until(
+                EC.presence_of_element_located(self._SEL_GROUP)
             )
             return group_element.text.strip().upper()
         except Exception as e:
@@ -160,38 +360,33 @@ class LGEstatAutomation:
 
     def verify_person(self, person: PersonData) -> Dict:
         """
-        Complete verification flow for a person.
-        Returns verification results dictionary.
+        Look up a person's group in LGEstat.
+        Returns numero_personne, groupe_trouve ("" if unknown) and details (why the lookup
+        failed, "" otherwise); the comparison with groupe_attendu is done by compare_groups.
         """
         result = {
             "numero_personne": person.numero,
-            "groupe_attendu": person.groupe_attendu,
-            "nom": person.nom,
-            "prenom": person.prenom,
-            "est_dans_groupe": None,
             "groupe_trouve": "",
             "details": ""
         }
 
         try:
-            # Search for person
-            if not self.search_person(person.numero):
-                result["details"] = "Personne non trouvée"
-                return result
-
-            # Get actual group
-            groupe_trouve = self.get_person_group()
-            result["groupe_trouve"] = groupe_trouve
-
-            # Compare groups
+            groupe_trouve = self._group_cache.fresh().get(person.numero) or self.fetch_group_http(person.numero)
             if groupe_trouve:
-                result["est_dans_groupe"] = (groupe_trouve == person.groupe_attendu)
-                result["details"] = (
-                    "OK" if result["est_dans_groupe"]
-                    else f"Groupe trouvé: {groupe_trouve}, Attendu: {person.groupe_attendu}"
-                )
+                self._group_cache[person.numero] = groupe_trouve
             else:
-                result["details"] = "Impossible de trouver l'information de groupe"
+                # Search for person
+                if not self.search_person(person.numero):
+                    result["details"] = "Personne non trouvée"
+                    return result
+
+                # Get actual group
+                groupe_trouve = self.get_person_group()
+                if groupe_trouve:
+                    self._group_cache[person.numero] = groupe_trouve
+                else:
+                    result["details"] = "Impossible de trouver l'information de groupe"
+            result["groupe_trouve"] = groupe_trouve
 
         except Exception as e:
             result["details"] = f"Erreur: {str(e)}"
@@ -199,51 +394,308 @@ class LGEstatAutomation:
 
         return result
 
-    def process_verification_file(self, file_path: str, output_path: str = None) -> pd.DataFrame:
+    def ensure_logged_in(self) -> None:
+        """
+        Make sure the browser is alive and authenticated, (re)starting it and logging in as needed.
+        A warm session is probed by opening the search page: a session expired on the server
+        redirects to /auth/login. Raises RuntimeError if login fails.
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            if self.driver:
+                self.driver.get(self.SEARCH_URL)
+                if "/auth/login" not in self.driver.current_url:
+                    return
+            if self.login():
+                return
+        except WebDriverException as e:
+            # Chrome died (crash, OOM...): start a fresh one
+            logger.warning(f"Navigateur LGEstat indisponible, redémarrage: {e}")
+            self._quit_driver()
+            try:
+                if self.login():
+                    return
+            except WebDriverException as e2:
+                raise RuntimeError("Failed to start browser for LGEstat") from e2
+        raise RuntimeError("Failed to login to LGEstat")
+
+    def clone(self, worker: int) -> "LGEstatAutomation":
+        """Return a new (not yet started) automation with the same credentials and group cache."""
+        other = LGEstatAutomation(self.client_id, self.email, self.password, headless=self.headless,
+                                  profile_dir=self.profile_dir, worker=worker)
+        other._group_cache = self._group_cache
+        return other
+
+    def clear_cache(self) -> None:
+        """Forget every cached group (shared with clones)."""
+        self._group_cache.clear()
+
+    def load_cache(self, path: Path = GROUP_CACHE_PATH) -> int:
+        """Load groups cached today for this account from path; returns the number of entries loaded."""
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            stamp = (data.get("date"), data.get("client_id"), data.get("email"))
+            groups = data.get("groups", {})
+            if not isinstance(groups, dict):
+                return 0
+        except (OSError, ValueError, AttributeError):
+            return 0  # unreadable or not a cache object
+        cache = self._group_cache.fresh()
+        if stamp != (cache.day, self.client_id, self.email):
+            return 0  # another day (groups may have changed) or another account: ignored
+        cache.update(groups)
+        return len(groups)
+
+    def save_cache(self, path: Path = GROUP_CACHE_PATH) -> None:
+        """Write the group cache to path, stamped with today's date and the account."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        tmp.write_text(
+            json.dumps({
+                "date": self._group_cache.fresh().day,
+                "client_id": self.client_id,
+                "email": self.email,
+                "groups": self._group_cache,
+            }, ensure_ascii=False),
+            encoding="utf-8"
+        )
+        os.replace(tmp, path)
+
+    def open_sessions(self, n: int) -> List[LGEstatAutomation]:
+        """
+        Return n logged-in sessions: this one plus n - 1 worker clones.
+        Each worker owns its own browser (a driver can't be used from two threads, even on
+        separate tabs); workers are started on demand and stay open until shutdown().
+        Raises RuntimeError if a session cannot log in.
+        """
+        n_workers = max(1, n) - 1
+        while len(self._workers) < n_workers:
+            self._workers.append(self.clone(self.worker + len(self._workers) + 1))
+        sessions = [self] + self._workers[:n_workers]
+        with ThreadPoolExecutor(max_workers=len(sessions)) as executor:
+            list(executor.map(lambda s: s.ensure_logged_in(), sessions))
+        return sessions
+
+    def process_verification_file(self, file_path: str, output_path: str = None, concurrency: int = 1) -> pd.DataFrame:
         """
         Process a verification file and return results as DataFrame.
         Args:
             file_path: Path to input file (.xlsx, .csv, .numbers)
             output_path: Optional path to save results CSV
+            concurrency: Number of browser sessions verifying in parallel
         """
         from core.utils import read_table, normalize
 
         # Read and normalize input data
         df = read_table(file_path)
         df = normalize(df)
+        return self.verify_dataframe(df, output_path, concurrency=concurrency)
 
-        if not self.driver or "/auth/login" in self.driver.current_url:
-            if not self.login():
-                raise RuntimeError("Failed to login to LGEstat")
+    def verify_dataframe(self, df: pd.DataFrame, output_path: str = None, concurrency: int = 1) -> pd.DataFrame:
+        """
+        Verify every row of a normalized DataFrame and return results in row order.
+        Args:
+            df: Output of core.utils.normalize
+            output_path: Optional path to save results CSV
+            concurrency: Number of browser sessions verifying in parallel (this one + clones)
+        """
+        import numpy as np
+        import pandas as pd
 
-        # Process each person
-        results = []
-        for i, row in df.iterrows():
-            person = PersonData(
-                numero=row["numero_personne"],
-                groupe_attendu=row["groupe_attendu"],
-                nom=row.get("nom", ""),
-                prenom=row.get("prenom", "")
-            )
-            logger.info(f"[{i+1}/{len(df)}] Vérifier {person.numero} contre {person.groupe_attendu}")
-            result = self.verify_person(person)
-            results.append(result)
+        # A numero repeated in the file is only looked up once
+        unique = df.drop_duplicates("numero_personne")
+
+        sessions = self.open_sessions(min(concurrency, len(unique)))
 
-        # Create results DataFrame
-        results_df = pd.DataFrame(results)
+        persons = [
+            PersonData(
+                numero=t.numero_personne,
+                groupe_attendu=t.groupe_attendu,
+                nom=getattr(t, "nom", ""),
+                prenom=getattr(t, "prenom", "")
+            )
+            for t in unique.itertuples(index=False)
+        ]
+
+        # Report rows are appended (and flushed) in input order as soon as their numero is
+        # verified, so a crash mid-run keeps everything written so far
+        pos = pd.Index(unique["numero_personne"]).get_indexer(df["numero_personne"])
+        inputs = _input_columns(df)
+        ready = np.zeros(len(unique), dtype=bool)
+        next_row = written = 0
+        out = open(output_path, "w", newline="", encoding="utf-8") if output_path else None
+        try:
+            if out:
+                writer = csv.writer(out)
+                writer.writerow(RESULT_COLUMNS)
+
+            # Process unique persons concurrently, results written into preallocated arrays
+            n = len(persons)
+            groupe_by_pos = np.full(n, "", dtype=object)
+            details_by_pos = np.full(n, "", dtype=object)
+            for done, (i, result) in enumerate(verify_concurrently(persons, sessions), 1):
+                groupe_by_pos[i] = result["groupe_trouve"]
+                details_by_pos[i] = result["details"]
+                # lazy: the message is only formatted if INFO is emitted
+                logger.opt(lazy=True).info(
+                    "[{}/{}] Vérifié {} contre {}",
+                    lambda: done, lambda: n, lambda: persons[i].numero, lambda: persons[i].groupe_attendu
+                )
 
-        # Save if output path provided
+                ready[i] = True
+                while next_row < len(df) and ready[pos[next_row]]:
+                    next_row += 1
+                if out and next_row > written:
+                    # Only the newly ready rows: positions are precomputed, no DataFrame per write
+                    rows = slice(written, next_row)
+                    writer.writerows(zip(*_compare_rows(
+                        [col[rows] for col in inputs], pos[rows], groupe_by_pos, details_by_pos
+                    )))
+                    out.flush()
+                    written = next_row
+        finally:
+            if out:
+                out.close()
+
+        results_df = pd.DataFrame(dict(zip(RESULT_COLUMNS, _compare_rows(inputs, pos, groupe_by_pos, details_by_pos))))
         if output_path:
-            results_df.to_csv(output_path, index=False)
             logger.success(f"Results saved to {output_path}")
 
         return results_df
 
-    def close(self):
-        """Clean up and close the browser."""
+    def shutdown(self) -> None:
+        """Quit the browser and its worker browsers."""
+        for worker in self._workers:
+            worker.shutdown()
+        self._workers = []
+        self._quit_driver()
+
+    def _quit_driver(self) -> None:
+        """Quit this browser (even if it already died) and release its profile."""
+        if self._http_session is not None:
+            self._http_session.close()
+            self._http_session = None
         if self.driver:
             try:
                 self.driver.quit()
             except Exception:
                 pass
-            self.driver = None
\ No newline at end of file
+            self.driver = None
+        self._release_profile()  # only once Chrome has exited
+
+    close = shutdown  # former name, kept for existing callers
+
+
+class LGEstatSession:
+    """
+    Process-wide LGEstat browsers kept alive across verification runs, one session (plus its
+    warm worker clones) per account. Each comes with a lock: hold it while using the session,
+    Selenium drivers are not thread-safe (e.g. two Streamlit users verifying at once).
+    """
+
+    _instances: Dict[Tuple[str, str, bool], Tuple[threading.Lock, LGEstatAutomation]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, client_id: str, email: str, password: str,
+            headless: bool = True) -> Tuple[threading.Lock, LGEstatAutomation]:
+        """
+        Return (lock, session) for these credentials. The browsers are started on demand
+        (open_sessions / ensure_logged_in), under the lock.
+        """
+        key = (client_id, email, headless)
+        with cls._lock:
+            entry = cls._instances.get(key)
+            if entry is not None and entry[1].password != password:
+                with entry[0]:  # never quit browsers under a running verification
+                    entry[1].shutdown()
+                entry = None
+            if entry is None:
+                entry = cls._instances[key] = (
+                    threading.Lock(), LGEstatAutomation(client_id, email, password, headless=headless)
+                )
+        return entry
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Quit every shared browser, waiting for runs in progress."""
+        with cls._lock:
+            for lock, session in cls._instances.values():
+                with lock:
+                    session.shutdown()
+            cls._instances.clear()
+
+
+def _as_text(values):
+    """Object array of str, missing values as "" (pandas 3 keeps NaN through astype(str))."""
+    import pandas as pd
+
+    return pd.Series(values, dtype=object).fillna("").astype(str).to_numpy(dtype=object)
+
+def _input_columns(df: pd.DataFrame) -> List:
+    """numero_personne, groupe_attendu, nom, prenom of df as str object arrays ("" when absent)."""
+    import numpy as np
+
+    blank = np.full(len(df), "", dtype=object)
+    return [
+        _as_text(df[col].to_numpy(dtype=object)) if col in df.columns else blank
+        for col in ("numero_personne", "groupe_attendu", "nom", "prenom")
+    ]
+
+def _compare_rows(inputs: List, pos, groupe_trouve, lookup_details) -> List:
+    """
+    RESULT_COLUMNS arrays for rows given by their _input_columns and `pos`, the index of
+    each row's numero in groupe_trouve / lookup_details.
+    """
+    import numpy as np
+
+    numero, attendu, nom, prenom = inputs
+    trouve = _as_text(np.asarray(groupe_trouve, dtype=object)[pos])
+    found = trouve != ""
+    match = found & (trouve == attendu)
+    details = _as_text(np.asarray(lookup_details, dtype=object)[pos])
+    details[match] = "OK"
+    mismatch = found & ~match  # message only built for the rows that need it
+    details[mismatch] = "Groupe trouvé: " + trouve[mismatch] + ", Attendu: " + attendu[mismatch]
+    est_dans_groupe = np.where(found, match, None)  # None: group could not be read
+    return [numero, attendu, nom, prenom, est_dans_groupe, trouve, details]
+
+def compare_groups(df: pd.DataFrame, numeros, groupe_trouve, lookup_details) -> pd.DataFrame:
+    """
+    Build one result row (RESULT_COLUMNS) per df row from the lookups of the unique `numeros`
+    (groupe_trouve / lookup_details are aligned with numeros, as returned by verify_person).
+    est_dans_groupe and details are computed on whole columns.
+    """
+    import pandas as pd
+
+    # Spread the unique lookups back onto every input row
+    pos = pd.Index(numeros).get_indexer(df["numero_personne"])
+    return pd.DataFrame(dict(zip(RESULT_COLUMNS, _compare_rows(_input_columns(df), pos, groupe_trouve, lookup_details))))
+
+def verify_concurrently(persons: List[PersonData], sessions: List[LGEstatAutomation]) -> Iterator[Tuple[int, Dict]]:
+    """
+    Verify persons over a pool of logged-in sessions, one worker thread per session.
+    Yields (index in persons, result) as verifications complete.
+    """
+    # A session is used by one thread at a time: workers borrow it from the idle queue
+    idle: "queue.Queue[LGEstatAutomation]" = queue.Queue()
+    for session in sessions:
+        idle.put(session)
+
+    def _verify(person: PersonData) -> Dict:
+        session = idle.get()
+        try:
+            return session.verify_person(person)
+        finally:
+            idle.put(session)
+
+    executor = ThreadPoolExecutor(max_workers=len(sessions))
+    try:
+        futures = {executor.submit(_verify, person): i for i, person in enumerate(persons)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Consumer stopped early (rerun, error while writing...): drop the lookups not started yet
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -4,10 +4,18 @@ Provides common functions for file handling and data normalization.
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from pathlib import Path
 from typing import Dict, List
 from loguru import logger
 
+# Only columns consumed by normalize() and the verification are parsed
+WANTED_COLUMNS = {"numero_personne", "groupe_attendu", "nom", "prenom"}
+
+def _is_wanted(column) -> bool:
+    return str(column).strip().lower() in WANTED_COLUMNS
+
 def read_table(input_path: str) -> pd.DataFrame:
     """Read input file (CSV, Excel, or Numbers) and return DataFrame."""
     p = Path(input_path)
@@ -16,9 +24,16 @@ def read_table(input_path: str) -> pd.DataFrame:
 
     ext = p.suffix.lower()
     if ext == ".csv":
-        df = pd.read_csv(p)
+        # Probe the header, then parse only the wanted columns as strings (no type inference,
+        # so leading zeros in numbers survive: pandas' pyarrow engine would cast after inferring)
+        cols = [c for c in pd.read_csv(p, nrows=0).columns if _is_wanted(c)]
+        df = pacsv.read_csv(p, convert_options=pacsv.ConvertOptions(
+            include_columns=cols,
+            column_types={c: pa.string() for c in cols},
+            strings_can_be_null=True,
+        )).to_pandas()
     elif ext in (".xlsx", ".xlsm"):
-        df = pd.read_excel(p)
+        df = pd.read_excel(p, usecols=_is_wanted, dtype=str, engine="calamine")
     elif ext == ".numbers":
         try:
             from numbers_parser import Document
@@ -34,29 +49,34 @@ def read_table(input_path: str) -> pd.DataFrame:
         tbl = sheets[0].tables[0]
         data = [[cell.value for cell in row] for row in tbl.rows()]
         df = pd.DataFrame(data[1:], columns=[str(c) for c in data[0]])
+        df = df.loc[:, [_is_wanted(c) for c in df.columns]]
     else:
         raise ValueError(f"Extension non supportée: {ext}")
 
     # Normalize headers
-    df.columns = [c.strip().lower() for c in df.columns]
+    df.columns = [str(c).strip().lower() for c in df.columns]
     return df
 
 def normalize(df: pd.DataFrame) -> pd.DataFrame:
     """Normalize and validate input DataFrame."""
-    # Required columns check
+    # Required columns check (all at once, before any browser is started)
     required = ["numero_personne", "groupe_attendu"]
-    for col in required:
-        if col not in df.columns:
-            raise ValueError(f"Colonne manquante: {col} (requis: {required})")
-
-    # Clean up data
-    df["numero_personne"] = df["numero_personne"].astype(str).str.strip()
-    df["groupe_attendu"] = df["groupe_attendu"].astype(str).str.strip().str.upper()
-
-    # Optional columns
-    if "nom" in df.columns:
-        df["nom"] = df["nom"].astype(str).str.strip().str.upper()
-    if "prenom" in df.columns:
-        df["prenom"] = df["prenom"].astype(str).str.strip().str.upper()
+    present = set(df.columns)
+    missing = [col for col in required if col not in present]
+    if missing:
+        raise ValueError(f"Colonne manquante: {', '.join(missing)} (requis: {required})")
+
+    # Clean up data: one cast to Arrow-backed strings, then C-level strip/upper
+    upper = [c for c in ("groupe_attendu", "nom", "prenom") if c in present]
+    cols = ["numero_personne"] + upper
+    df[cols] = df[cols].astype("string[pyarrow]").fillna("")
+    df["numero_personne"] = df["numero_personne"].str.strip()
+    df[upper] = df[upper].apply(lambda col: col.str.strip().str.upper())
+
+    # A blank numero would be sent to LGEstat as an empty search: drop those rows
+    blank = df["numero_personne"] == ""
+    if blank.any():
+        logger.warning(f"{int(blank.sum())} ligne(s) sans numero_personne ignorée(s)")
+        df = df.loc[~blank].reset_index(drop=True)
 
     return df
\ No newline at end of file
@@ -6,6 +6,7 @@ que la personne appartient bien au groupe indiqué.
 
 Usage:
   python verify_groups.py --input chemin/vers/fichier.numbers --headless 1
+  python verify_groups.py --input a.xlsx b.csv   # un seul navigateur pour tous les fichiers
 Prérequis:
   pip install pandas openpyxl selenium python-dotenv loguru numbers-parser
 """
@@ -15,15 +16,13 @@ import sys
 import argparse
 from pathlib import Path
 
-import pandas as pd
 from loguru import logger
 from dotenv import load_dotenv
 
 # Add parent directory to Python path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
-from core.lgestat import LGEstatAutomation
-from core.utils import read_table, normalize
+from core.lgestat import LGEstatSession, GROUP_CACHE_PATH  # light: Selenium is imported lazily
 
 # Load environment variables
 load_dotenv()
@@ -33,15 +32,20 @@ LGESTAT_CLIENT_ID = os.getenv("LGESTAT_CLIENT_ID")
 LGESTAT_EMAIL = os.getenv("LGESTAT_EMAIL")
 LGESTAT_PASSWORD = os.getenv("LGESTAT_PASSWORD")
 
-from core.utils import read_table, normalize
-
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--input", required=True, help="Chemin vers .numbers/.xlsx/.csv")
+    parser.add_argument("--input", required=True, nargs="+", help="Chemin(s) vers .numbers/.xlsx/.csv")
     parser.add_argument("--headless", type=int, default=1, help="1=headless, 0=visible")
-    parser.add_argument("--out", default="rapport_verification.csv", help="CSV de sortie")
+    parser.add_argument("--out", default="rapport_verification.csv",
+                        help="CSV de sortie (préfixé par le nom du fichier si plusieurs entrées)")
+    parser.add_argument("--cache", default=str(GROUP_CACHE_PATH), help="Cache des groupes déjà vérifiés aujourd'hui")
+    parser.add_argument("--no-cache", action="store_true", help="Ne pas utiliser de cache des groupes (ni disque, ni entre fichiers)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Nombre de navigateurs en parallèle")
     args = parser.parse_args()
 
+    # pandas/pyarrow only once there is work to do (keeps --help instant)
+    from core.utils import read_table, normalize
+
     # Verify environment variables
     if not all([LGESTAT_CLIENT_ID, LGESTAT_EMAIL, LGESTAT_PASSWORD]):
         raise ValueError(
@@ -51,42 +55,45 @@ def main():
             "LGESTAT_PASSWORD=votre_mot_de_passe"
         )
 
-    # Read and normalize input data
-    logger.info(f"Lecture du fichier: {args.input}")
-    df = read_table(args.input)
-    df = normalize(df)
-
-    # Initialize LGEstat automation
-    logger.info(f"{len(df)} lignes chargées. Démarrage du navigateur...")
-    lgestat = LGEstatAutomation(
-        client_id=LGESTAT_CLIENT_ID,
-        email=LGESTAT_EMAIL,
-        password=LGESTAT_PASSWORD,
-        headless=bool(args.headless)
-    )
+    # Read and normalize every input first: a bad file fails before Chrome starts
+    tables = []
+    for input_path in args.input:
+        logger.info(f"Lecture du fichier: {input_path}")
+        df = normalize(read_table(input_path))
+        logger.info(f"{len(df)} lignes chargées.")
+        tables.append((input_path, df))
 
     try:
-        # Login to LGEstat
-        if not lgestat.login():
-            raise RuntimeError("Échec de connexion à LGEstat")
-
-        # Process each person
-        results = []
-        for i, row in df.iterrows():
-            numero = row["numero_personne"]
-            groupe = row["groupe_attendu"]
-            logger.info(f"[{i+1}/{len(df)}] Vérifier {numero} contre {groupe}")
-
-            res = lgestat.find_person_and_check_group(numero, groupe)
-            results.append(res)
-
-        # Save results
-        out_df = pd.DataFrame(results)
-        out_df.to_csv(args.out, index=False)
-        logger.success(f"Rapport généré: {args.out}")
+        # One warm, logged-in browser (plus workers) shared by every input file
+        logger.info("Démarrage du navigateur...")
+        lock, lgestat = LGEstatSession.get(
+            client_id=LGESTAT_CLIENT_ID,
+            email=LGESTAT_EMAIL,
+            password=LGESTAT_PASSWORD,
+            headless=bool(args.headless)
+        )
+        with lock:
+            lgestat.ensure_logged_in()
+            if not args.no_cache:
+                logger.info(f"{lgestat.load_cache(args.cache)} groupes chargés depuis le cache")
+
+            for input_path, df in tables:
+                out = Path(args.out)
+                if len(args.input) > 1:
+                    out = out.with_name(f"{Path(input_path).stem}_{out.name}")
+
+                # --no-cache: nothing cached by earlier inputs either, every numero is looked up
+                if args.no_cache:
+                    lgestat.clear_cache()
+
+                # Verify each person (args.concurrency browsers) and save results
+                lgestat.verify_dataframe(df, str(out), concurrency=args.concurrency)
+                logger.success(f"Rapport généré: {out}")
+                if not args.no_cache:
+                    lgestat.save_cache(args.cache)
 
     finally:
-        lgestat.close()
+        LGEstatSession.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file